@@ -28,6 +28,10 @@ detection_result = None
 
 tips_id = [4,8,12,16,20]
 
+# Ancho máximo de la imagen para la detección; las coordenadas son normalizadas,
+# así que se puede reducir manteniendo la proporción
+mp_max_width = 256
+
 
 
 def get_result(result: HandLandmarkerResult, output_image: mp.Image, timestamp_ms: int):
@@ -95,9 +99,13 @@ body_little.position = (320, 240)  # Posición inicial en el centro
 circle = pymunk.Circle(body_little, 5)
 space.add(body_little, circle)
 
+# Cuerpos en el mismo orden que tips_id
+tip_bodies = [body_thumb, body_index, body_middle, body_ring, body_little]
+
 options = HandLandmarkerOptions(
     base_options=BaseOptions(model_asset_path=model_path),
     running_mode=VisionRunningMode.LIVE_STREAM,
+    num_hands=1,  # solo se usa la primera mano
     result_callback=get_result)
 
 
@@ -105,7 +113,12 @@ with HandLandmarker.create_from_options(options) as landmarker:
   # The landmarker is initialized. Use it here.
   # ...
   cap = cv2.VideoCapture(0)
+  # Solo el frame más reciente y baja resolución para reducir la latencia
+  cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+  cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
+  cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
   running = True
+  flip_buf = small_buf = rgb_buf = None
   while cap.isOpened() and running:
     for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -115,43 +128,38 @@ with HandLandmarker.create_from_options(options) as landmarker:
       print("Ignoring empty camera frame.")
       # If loading a video, use 'break' instead of 'continue'.
       continue
-    image = cv2.flip(image,1)
-    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+    # Reutilizar los buffers en lugar de crear imágenes nuevas cada frame
+    if flip_buf is None or flip_buf.shape != image.shape:
+      flip_buf = np.empty_like(image)
+    image = cv2.flip(image, 1, dst=flip_buf)
+    mp_input = image
+    h, w = image.shape[:2]
+    if w > mp_max_width:
+      # Solo se reduce si el frame es más grande, sin deformar la imagen
+      size = (mp_max_width, h * mp_max_width // w)
+      if small_buf is None or small_buf.shape[:2] != (size[1], size[0]):
+        small_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+      cv2.resize(image, size, dst=small_buf, interpolation=cv2.INTER_AREA)
+      mp_input = small_buf
+    if rgb_buf is None or rgb_buf.shape != mp_input.shape:
+      rgb_buf = np.empty_like(mp_input)
+    cv2.cvtColor(mp_input, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_buf)
     frame_timestamp_ms = int(time.time() * 1000)
     landmarker.detect_async(mp_image, frame_timestamp_ms)
     if detection_result is not None:
-      image = draw_landmarks_on_image(mp_image.numpy_view(), detection_result)
+      image = draw_landmarks_on_image(image, detection_result)
       
       #image = draw_bb_with_letter(image,detection_result,'A')
       if len(detection_result.hand_landmarks) > 0:
         landmarks = detection_result.hand_landmarks[0]
-        # Obtener coordenadas de los dedos
-        index_finger_tip = landmarks[8]
-        middle_finger_tip = landmarks[12]
-        thumb_finger_tip = landmarks[4]
-        ring_finger_tip = landmarks[16]
-        little_finger_tip = landmarks[20]
+        # Convertir las puntas de los dedos a la pantalla de pygame de una vez
+        tips = np.array([(landmarks[i].x, landmarks[i].y) for i in tips_id], dtype=np.float32)
+        tips *= (640, 480)
 
-        
-            
-        # Convertir coordenadas normalizadas a la pantalla de pygame
-        screen_x_index = int(index_finger_tip.x * 640)
-        screen_y_index = int(index_finger_tip.y * 480)
-        screen_x_middle = int(middle_finger_tip.x * 640)
-        screen_y_middle= int(middle_finger_tip.y * 480)
-        screen_x_thumb = int(thumb_finger_tip.x * 640)
-        screen_y_thumb = int(thumb_finger_tip.y * 480)
-        screen_x_ring = int(ring_finger_tip.x * 640)
-        screen_y_ring = int(ring_finger_tip.y * 480)
-        screen_x_little = int(little_finger_tip.x * 640)
-        screen_y_little = int(little_finger_tip.y * 480)
-
-        # Actualizar posición del objeto en Pymunk
-        body_index.position = screen_x_index, screen_y_index
-        body_middle.position = screen_x_middle, screen_y_middle
-        body_ring.position = screen_x_ring, screen_y_ring
-        body_little.position = screen_x_little, screen_y_little
-        body_thumb.position = screen_x_thumb, screen_y_thumb
+        # Actualizar posición de los objetos en Pymunk
+        for body, pos in zip(tip_bodies, tips.astype(np.int32).tolist()):
+          body.position = pos
         
     # Avanzar la simulación de Pymunk
     space.step(1 / 60.0)
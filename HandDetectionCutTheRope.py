@@ -2,9 +2,10 @@ import cv2
 import mediapipe as mp
 import pygame
 import pymunk
-import pymunk.pygame_util
-from pygame.locals import QUIT
-import math
+from pygame.locals import QUIT, VIDEOEXPOSE, WINDOWEXPOSED
+import threading
+import time
+import numpy as np
 
 # Initialize Pygame
 pygame.init()
@@ -12,24 +13,40 @@ WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock = pygame.time.Clock()
 font = pygame.font.SysFont(None, 48)
+# Win message is rendered once and blitted every frame
+WIN_TEXT = font.render("You Win!", True, (255, 255, 255))
+WIN_POS = (WIDTH // 2 - WIN_TEXT.get_width() // 2, HEIGHT // 2 - WIN_TEXT.get_height() // 2)
 
 # Mediapipe setup
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+BaseOptions = mp.tasks.BaseOptions
+HandLandmarker = mp.tasks.vision.HandLandmarker
+HandLandmarkerOptions = mp.tasks.vision.HandLandmarkerOptions
+VisionRunningMode = mp.tasks.vision.RunningMode
 cap = cv2.VideoCapture(0)
+# Keep only the newest frame and capture at low resolution to cut input lag
+cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
+cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
 
 # Pymunk setup
 space = pymunk.Space()
 space.gravity = (0, 900)
-draw_options = pymunk.pygame_util.DrawOptions(screen)
+
+# Joints attached to each body, so a cut segment finds its joints without scanning the space
+body_to_joints = {}
+
+
+def add_joint(space, joint):
+    """Adds a joint to the space and indexes it under both of its bodies."""
+    space.add(joint)
+    body_to_joints.setdefault(joint.a, []).append(joint)
+    body_to_joints.setdefault(joint.b, []).append(joint)
 
 
 def create_rope(space, start_pos, length=10, segment_length=20):
     """Creates a rope with tightly connected segments, anchored at the top."""
     segments = []
-    static_body = pymunk.Body(body_type= pymunk.Body.STATIC)
-    prev_body = static_body
-    static_body.position = start_pos
+    prev_body = space.static_body
     
     for i in range(1, length):
         body = pymunk.Body()
@@ -40,9 +57,11 @@ def create_rope(space, start_pos, length=10, segment_length=20):
         space.add(body, shape)
         segments.append(shape)
         
-        # Connect the segment to the previous body with tight joints
-        joint = pymunk.PinJoint(prev_body, body)
-        space.add(joint)
+        # Connect the segment to the previous body with tight joints,
+        # the first one to the space's static body at the anchor point
+        anchor = start_pos if prev_body is space.static_body else (0, 0)
+        joint = pymunk.PinJoint(prev_body, body, anchor)
+        add_joint(space, joint)
         
         prev_body = body
 
@@ -55,6 +74,10 @@ ropes = [
     create_rope(space, (400, 100)),
     create_rope(space, (600, 100)),
 ]
+# Every rope segment in one list, in rope order, and a buffer for their positions
+# gathered once per frame for both drawing and the cut test
+all_segments = [segment for rope in ropes for segment in rope]
+seg_pos_buf = np.empty((len(all_segments), 2))
 
 # Add candy object
 candy_body = pymunk.Body()
@@ -65,105 +88,275 @@ space.add(candy_body, candy_shape)
 
 # Attach candy to the bottom of the middle rope
 candy_joint = pymunk.PinJoint(candy_body, ropes[1][-1].body)
-space.add(candy_joint)
+add_joint(space, candy_joint)
 candy_joint = pymunk.SlideJoint(candy_body, ropes[0][-1].body, (0,0), (0,0), min=20, max=40)
-space.add(candy_joint)
+add_joint(space, candy_joint)
 candy_joint = pymunk.SlideJoint(candy_body, ropes[2][-1].body, (0,0), (0,0), min=20, max=40)
-space.add(candy_joint)
+add_joint(space, candy_joint)
 
 # Goal area
 goal_rect = pygame.Rect(300, 500, 200, 50)
 
+# Distance from the index fingertip at which a rope segment gets cut
+CUT_RADIUS = 10
+CUT_RADIUS_SQ = CUT_RADIUS * CUT_RADIUS
+
+
+def cut_segment(i):
+    """
+    Removes the rope segment at index `i` of all_segments and every joint attached to it.
+    all_segments and the ropes are updated together so all_segments stays the ropes joined in order.
+    """
+    segment = all_segments.pop(i)
+    body = segment.body
+    for joint in body_to_joints.pop(body, ()):
+        other = joint.b if joint.a is body else joint.a
+        body_to_joints[other].remove(joint)
+        space.remove(joint)
+    space.remove(body, segment)
+    for r, rope in enumerate(ropes):
+        if segment in rope:
+            # Split the rope at the cut so each piece is drawn on its own
+            j = rope.index(segment)
+            ropes[r:r + 1] = [piece for piece in (rope[:j], rope[j + 1:]) if piece]
+            break
+
+def rope_anchor(rope):
+    """Returns the point a rope piece hangs from, or None if the piece was cut loose."""
+    for joint in body_to_joints.get(rope[0].body, ()):
+        if joint.a is space.static_body:
+            # The static body sits at the origin, so its anchor is already in world coordinates
+            return tuple(joint.anchor_a)
+    return None
+
 # Cutting motion detection
-def is_cutting_motion(landmarks):
+def is_cutting_motion(lm):
         """
         Determines if the index and middle fingers are extended and making a cutting motion.
+        `lm` is a nested list of 21 [x, y, z] normalized landmark coordinates; plain Python
+        floats compare much faster than NumPy scalars indexed out of an array.
         """
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        index_pip = landmarks[6]
-        middle_pip = landmarks[10]
+        # Fingers are extended when the tip is above the PIP joint, and they cut
+        # when both tips are horizontally close together
+        return (lm[8][1] < lm[6][1] and lm[12][1] < lm[10][1]
+                and abs(lm[8][0] - lm[12][0]) < 0.05)
 
-        # Check if fingers are extended
-        index_extended = index_tip.y < index_pip.y
-        middle_extended = middle_tip.y < middle_pip.y
-
-        # Check relative horizontal distance for cutting motion
-        horizontal_distance = abs(index_tip.x - middle_tip.x)
-        cutting_motion = index_extended and middle_extended and horizontal_distance < 0.05
-
-        return cutting_motion
+def check_frame(lm, seg_pos, point):
+        """
+        Runs the per-frame hand checks in one call. `lm` is the landmark list taken by
+        is_cutting_motion. Returns whether the hand is cutting and the indices of the
+        rope segments within reach of `point`, the index fingertip.
+        """
+        if not is_cutting_motion(lm):
+            return False, ()
+        d = seg_pos - point
+        return True, np.flatnonzero(np.einsum('ij,ij->i', d, d) < CUT_RADIUS_SQ)
+
+# Hand pose drawn on screen, refilled every frame, and the pose it blends from
+lm_arr = np.empty((21, 3), dtype=np.float32)
+blend_start = np.empty((21, 3), dtype=np.float32)
+SCREEN_SCALE = np.array([WIDTH, HEIGHT], dtype=np.float32)
+# Index and middle finger landmarks, the only ones drawn
+FINGER_IDS = [5, 6, 7, 8, 9, 10, 11, 12]
+
+# Last two hand detections as (arrival time, landmark array, landmark list), published by the
+# landmarker callback. The array feeds the blend and cut math, the list the gesture check.
+latest_lock = threading.Lock()
+prev_hand = None
+latest_hand = None
+camera_ok = True
+
+def store_result(result, output_image, timestamp_ms):
+    """
+    Live stream callback: keeps the two most recent hand detections for interpolation.
+    """
+    global prev_hand, latest_hand
+    if result.hand_landmarks:
+        landmarks = np.fromiter((v for p in result.hand_landmarks[0] for v in (p.x, p.y, p.z)),
+                                dtype=np.float32, count=63).reshape(21, 3)
+        hand = (time.monotonic(), landmarks, landmarks.tolist())
+        with latest_lock:
+            prev_hand, latest_hand = latest_hand, hand
+    else:
+        # Hand lost below the confidence thresholds: restart the interpolation
+        with latest_lock:
+            prev_hand = latest_hand = None
+
+# Fraction of the detection interval the drawn hand takes to reach a new detection.
+# Short enough that the fingers catch up with the cut point within about one render frame.
+BLEND_SPAN = 0.25
+
+def interpolate_hand(start, prev, latest, now, out):
+    """
+    Writes the landmarks blended from `start`, the pose on screen when `latest` arrived,
+    towards `latest` into `out`, reaching `latest` after BLEND_SPAN of a detection interval.
+    This only softens the drawn fingers; until the blend finishes they trail the cut
+    point, which always uses `latest` directly.
+    """
+    t_latest, lm_latest = latest[0], latest[1]
+    span = (t_latest - prev[0]) * BLEND_SPAN if prev is not None else 0.0
+    t = min((now - t_latest) / span, 1.0) if span > 0 else 1.0
+    np.subtract(lm_latest, start, out=out)
+    out *= t
+    out += start
+    return out
+
+# Widest image handed to detection; landmarks are normalized, so larger frames
+# can be shrunk as long as the aspect ratio is kept
+MP_MAX_WIDTH = 256
+
+# Live stream mode reuses the tracked hand between frames instead of
+# rerunning palm detection every time
+options = HandLandmarkerOptions(
+    base_options=BaseOptions(model_asset_path='hand_landmarker.task'),
+    running_mode=VisionRunningMode.LIVE_STREAM,
+    num_hands=1,
+    min_hand_detection_confidence=0.7,
+    min_tracking_confidence=0.7,
+    result_callback=store_result)
+landmarker = HandLandmarker.create_from_options(options)
+
+def capture_worker():
+    """
+    Reads camera frames and feeds them to the hand landmarker off the game loop.
+    """
+    global camera_ok
+    # Any exit, including an exception, stops the game loop instead of silently
+    # freezing hand input; the exception's traceback is still printed by the thread
+    try:
+        # Reused buffers instead of new images per frame, sized from the first frame
+        small_buf = flip_buf = rgb_buf = None
+        frame_id = 0
+        last_ts = -1
+        while running:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Detect on every other frame, the game loop interpolates in between.
+            # Frames are still read so the camera buffer never goes stale.
+            frame_id += 1
+            if frame_id % 2:
+                continue
+            # Shrink frames wider than MP_MAX_WIDTH first, without distorting them,
+            # so flipping and converting touch fewer pixels
+            h, w = frame.shape[:2]
+            if w > MP_MAX_WIDTH:
+                size = (MP_MAX_WIDTH, h * MP_MAX_WIDTH // w)
+                if small_buf is None or small_buf.shape[:2] != (size[1], size[0]):
+                    small_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                cv2.resize(frame, size, dst=small_buf, interpolation=cv2.INTER_AREA)
+                frame = small_buf
+            if flip_buf is None or flip_buf.shape != frame.shape:
+                flip_buf = np.empty_like(frame)
+                rgb_buf = np.empty_like(frame)
+            cv2.flip(frame, 1, dst=flip_buf)
+            cv2.cvtColor(flip_buf, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_buf)
+            # Live stream mode rejects timestamps that don't strictly increase, so use a
+            # monotonic clock and never repeat a millisecond
+            last_ts = max(int(time.monotonic() * 1000), last_ts + 1)
+            landmarker.detect_async(mp_image, last_ts)
+    finally:
+        camera_ok = False
 
 # Game loop
 running = True
 win = False
+capture_thread = threading.Thread(target=capture_worker, daemon=True)
+capture_thread.start()
+
+# Only the areas drawn in the previous and current frame are cleared and pushed to the display,
+# except on the first frame and whenever the window is exposed, which push the whole screen
+screen.fill((0, 0, 0))
+prev_dirty = []
+full_redraw = True
+blended_to = None
 while running:
     for event in pygame.event.get():
         if event.type == QUIT:
             running = False
+        elif event.type in (WINDOWEXPOSED, VIDEOEXPOSE):
+            full_redraw = True
 
-    # Capture frame from camera
-    ret, frame = cap.read()
-    if not ret:
+    # Grab the newest detections without waiting for the camera
+    if not camera_ok:
         break
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
-
-    # Display camera input
-    cv2.imshow("Camera Input", frame)
+    with latest_lock:
+        prev, latest = prev_hand, latest_hand
     
-    # Clear screen
-    screen.fill((0, 0, 0))
+    # Clear what was drawn last frame
+    for rect in prev_dirty:
+        screen.fill((0, 0, 0), rect)
+    dirty = []
 
-    # Draw goal area
+    # Draw goal area (static, redrawn in case a cleared area overlapped it)
     pygame.draw.rect(screen, (0, 255, 0), goal_rect)
 
-    # Draw ropes
-    space.debug_draw(draw_options)
-
-    # Draw candy (with safety check)
-    candy_x, candy_y = candy_body.position
-    if not (math.isnan(candy_x) or math.isnan(candy_y)):
-        pygame.draw.circle(screen, (255, 165, 0), (int(candy_x), int(candy_y)), 15)
+    # Read every segment position once for this frame
+    seg_pos = seg_pos_buf[:len(all_segments)]
+    for i, segment in enumerate(all_segments):
+        p = segment.body.position
+        seg_pos[i, 0] = p.x
+        seg_pos[i, 1] = p.y
+
+    # Draw ropes, one polyline per rope starting at its anchor
+    start = 0
+    for rope in ropes:
+        end = start + len(rope)
+        pts = seg_pos[start:end].tolist()
+        anchor = rope_anchor(rope)
+        if anchor is not None:
+            pts.insert(0, anchor)
+        if len(pts) > 1:
+            dirty.append(pygame.draw.aalines(screen, (200, 200, 200), False, pts))
+        else:
+            # A loose single segment has no line to draw, show the segment itself
+            dirty.append(pygame.draw.circle(screen, (200, 200, 200), pts[0], 5))
+        start = end
+
+    # Draw candy (with safety check, NaN is the only value not equal to itself)
+    candy_pos = candy_body.position
+    candy_x = candy_pos.x
+    candy_y = candy_pos.y
+    if candy_x == candy_x and candy_y == candy_y:
+        # Tethers from the candy to the rope ends still holding it
+        for joint in body_to_joints.get(candy_body, ()):
+            dirty.append(pygame.draw.aaline(screen, (200, 200, 200), (candy_x, candy_y), tuple(joint.b.position)))
+        dirty.append(pygame.draw.circle(screen, (255, 165, 0), (int(candy_x), int(candy_y)), 15))
     else:
         print("Candy position invalid! Resetting simulation...")
         running = False  # Exit the game or handle gracefully
 
 
     # Main game loop (update hand detection logic)
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            landmarks = hand_landmarks.landmark
-
-            # Draw only index and middle fingers
-            for finger in [[5, 6, 7, 8], [9, 10, 11, 12]]:
-                for idx in finger:
-                    lm = landmarks[idx]
-                    x, y = int(lm.x * WIDTH), int(lm.y * HEIGHT)
-                    pygame.draw.circle(screen, (0, 255, 0), (x, y), 5)
-                
-            if is_cutting_motion(landmarks):
-                # Calculate position of the index finger (for cutting collision detection)
-                index_x = int(landmarks[8].x * WIDTH)
-                index_y = int(landmarks[8].y * HEIGHT)
-
-                pygame.draw.circle(screen, (255, 0, 0), (index_x, index_y), 10)  # Visualize cutting point
-                
-
-                # Check if the cutting point intersects with any rope segment
-                for rope in ropes:
-                    for segment in rope:
-                        p1 = segment.body.position
-                        p2 = segment.body.position
-                        if pygame.math.Vector2(index_x, index_y).distance_to((p1.x, p1.y)) < 10 or \
-                           pygame.math.Vector2(index_x, index_y).distance_to((p2.x, p2.y)) < 10:
-                            # Remove the segment and its joints safely
-                            for joint in space.constraints:
-                                if joint.a == segment.body or joint.b == segment.body:
-                                    space.remove(joint)
-                            space.remove(segment.body, segment)
-                            rope.remove(segment)
+    if latest is not None:
+        if latest is not blended_to:
+            # New detection: blend from the pose currently on screen, or snap to it
+            # if the hand was just (re)acquired
+            blend_start[:] = lm_arr if blended_to is not None else latest[1]
+            blended_to = latest
+        interpolate_hand(blend_start, prev, latest, time.monotonic(), lm_arr)
+        # Screen coordinates of every drawn landmark in one go
+        lm_px = (lm_arr[:, :2] * SCREEN_SCALE).astype(np.int32).tolist()
+
+        # Draw only index and middle fingers
+        for idx in FINGER_IDS:
+            dirty.append(pygame.draw.circle(screen, (0, 255, 0), lm_px[idx], 5))
+            
+        # The cut uses the newest detected pose, never a blended one
+        lm_latest = latest[1]
+        # Position of the index finger (for cutting collision detection)
+        index_pt = (lm_latest[8, :2] * SCREEN_SCALE).astype(np.int32)
+        # Check the cutting gesture and which rope segments it intersects
+        cutting, hits = check_frame(latest[2], seg_pos, index_pt)
+        if cutting:
+            dirty.append(pygame.draw.circle(screen, (255, 0, 0), index_pt.tolist(), 10))  # Visualize cutting point
+
+            # Walk hits backwards so earlier indices stay valid
+            for i in hits[::-1]:
+                cut_segment(i)
+    else:
+        blended_to = None
 
 
     # Check for win condition
@@ -172,16 +365,23 @@ while running:
 
     # Display win message
     if win:
-        text = font.render("You Win!", True, (255, 255, 255))
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - text.get_height() // 2))
+        dirty.append(screen.blit(WIN_TEXT, WIN_POS))
     else:
-        # Step physics
-        space.step(1 / 60.0)
+        # Step physics in two half steps per frame for a steadier rope
+        space.step(1 / 120.0)
+        space.step(1 / 120.0)
 
-    pygame.display.flip()
+    if full_redraw:
+        pygame.display.flip()
+        full_redraw = False
+    else:
+        pygame.display.update(prev_dirty + dirty)
+    prev_dirty = dirty
     clock.tick(60)
 
 # Cleanup
+running = False
+capture_thread.join()
+landmarker.close()
 cap.release()
-cv2.destroyAllWindows()
 pygame.quit()